@@ -37,9 +37,16 @@ Navigation:
 """
 
 import json
+import os
 import re
+from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson  # optional: faster CONFIG serialisation
+except ImportError:
+    orjson = None
+
 # Version history:
 #   1  - initial viewer (build-comic2.py, toc.txt STRAND/TOPIC format)
 #   2  - toc.txt human-editable format with JC LO codes, toc.json fallback,
@@ -48,23 +55,75 @@ from pathlib import Path
 #        CH B-CC format, collapsible chapter→section sidebar
 VERSION = "3"
 IMG_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+_REF_RE = re.compile(r'(\d+)-(\d+)-(\d+)')  # "3-04-25" (book-chapter-page)
+# toc.txt lines: "BOOK 1 | name", "CH 3-04 | name", "12 | section | LOs"
+# (any word starting BOOK/CH counts, e.g. "Ch. 1-02", "CHAPTER 3", as the old startswith did)
+_TOC_HEADER = re.compile(r'(BOOK|CH)\S*\s+([^\s|]+)[^|]*(?:\|([^|]*))?', re.I)
+_TOC_SECTION = re.compile(r'(\d+)\s*(?:\|([^|]*)(?:\|([^|]*))?.*)?$')
 
 
 def natural_sort_key(s):
-    return [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', str(s))]
+    """Alternating [text, int, text, ...] key, always starting and ending with text
+    (same shape as re.split(r'(\\d+)'), so keys of any two names stay comparable)"""
+    s = str(s)
+    out = []
+    i, n = 0, len(s)
+    while True:
+        j = i
+        while j < n and not s[j].isdecimal():
+            j += 1
+        out.append(s[i:j].lower())
+        if j == n:
+            return out
+        i = j
+        while j < n and s[j].isdecimal():
+            j += 1
+        out.append(int(s[i:j]))
+        i = j
+
+
+def _natural_sorted(names):
+    """Sort names naturally, decorating with precomputed keys (no key= callback).
+    B-CC-PP names sort on plain (book, chapter, page) int tuples; anything else
+    falls back to natural_sort_key."""
+    refs = [parse_ref(n) for n in names]
+    if None not in refs:
+        return [n for _, n in sorted(zip(refs, names))]
+    return [n for _, n in sorted((natural_sort_key(n), n) for n in names)]
+
+
+def _is_image(entry):
+    return entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMG_EXTENSIONS
+
+
+def _scan_images(d):
+    """Image filenames in d, via one scandir pass (no per-file Path objects)"""
+    with os.scandir(d) as it:
+        return [e.name for e in it if _is_image(e)]
+
+
+def parse_ref(name):
+    """'3-04-25.webp' → (3, 4, 25); None if not a B-CC-PP filename"""
+    m = _REF_RE.fullmatch(name.rpartition('.')[0])
+    return (int(m[1]), int(m[2]), int(m[3])) if m else None
 
 
 def find_images(folder):
     """Find images in pages/, webp/, or folder itself"""
+    # One listing of folder serves both the subfolder probe and the fallback
+    with os.scandir(folder) as it:
+        entries = list(it)
+    # Keyed case-insensitively, as Path.is_dir() matched on Windows/macOS (Pages/, WebP/)
+    subs = {e.name.lower(): e for e in entries if e.is_dir()}
     for sub in ['pages', 'webp']:
-        d = folder / sub
-        if d.is_dir():
-            imgs = [f.name for f in d.iterdir() if f.is_file() and f.suffix.lower() in IMG_EXTENSIONS]
+        if sub in subs:
+            d = Path(subs[sub].path)
+            imgs = _scan_images(d)
             if imgs:
-                return sorted(imgs, key=natural_sort_key), d
+                return _natural_sorted(imgs), d
     # Fallback: folder itself
-    imgs = [f.name for f in folder.iterdir() if f.is_file() and f.suffix.lower() in IMG_EXTENSIONS]
-    return sorted(imgs, key=natural_sort_key), folder
+    imgs = [e.name for e in entries if _is_image(e)]
+    return _natural_sorted(imgs), folder
 
 
 def parse_toc_txt(folder):
@@ -85,56 +144,59 @@ def parse_toc_txt(folder):
     cur_book = None
     cur_ch = None
 
-    for raw in f.read_text(encoding='utf-8').splitlines():
-        line = raw.strip()
-        if not line or line.startswith('#'):
-            continue
-
-        # Strip trailing ! or ~ markers (approx/manual flags)
-        clean = line.rstrip(' !~')
-        parts = [p.strip() for p in clean.split('|')]
-
-        # BOOK num | name (old format — just sets cur_book)
-        if parts[0].upper().startswith('BOOK'):
-            cur_book = int(parts[0].split()[1])
-            continue
-
-        # CH line — two formats:
-        #   CH 04 | name        (old, needs cur_book)
-        #   CH 3-04 | name      (new, book embedded)
-        if parts[0].upper().startswith('CH'):
-            token = parts[0].split()[1]  # "04" or "3-04"
-            ch_name = parts[1] if len(parts) > 1 else ''
-            
-            if '-' in token:
-                # New flat format: CH B-CC
-                b, c = token.split('-')
-                cur_book = int(b)
-                ch_num = int(c)
-            else:
-                # Old format: CH num (uses cur_book)
-                ch_num = int(token)
-            
-            if cur_book is None:
+    with f.open('r', encoding='utf-8') as fh:
+        for raw in fh:
+            raw = raw.rstrip('\n')
+            line = raw.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            # Strip trailing ! or ~ markers (approx/manual flags)
+            clean = line.rstrip(' !~')
+            m = _TOC_HEADER.match(clean)
+
+            # BOOK num | name (old format — just sets cur_book)
+            if m and m[1].upper() == 'BOOK':
+                cur_book = int(m[2])
                 continue
-            
-            ch_ref = f"{cur_book}-{ch_num:02d}"
-            toc_ref = f"{ch_ref}-01"
-            cur_ch = {'ref': ch_ref, 'number': ch_num, 'name': ch_name, 'toc': toc_ref, 'sections': []}
-            chapters.append(cur_ch)
-            continue
-
-        # Section: page | name | LOs
-        if cur_ch is not None and parts[0].isdigit():
-            page_num = int(parts[0])
-            sec_name = parts[1] if len(parts) > 1 else f'Page {page_num}'
-            lo_str = parts[2] if len(parts) > 2 else ''
-            los = [x.strip() for x in lo_str.split(',') if x.strip()] if lo_str else []
-            page_ref = f"{cur_ch['ref']}-{page_num:02d}"
-            sec = {'name': sec_name, 'page': page_ref}
-            if los:
-                sec['lo'] = los
-            cur_ch['sections'].append(sec)
+
+            # CH line — two formats:
+            #   CH 04 | name        (old, needs cur_book)
+            #   CH 3-04 | name      (new, book embedded)
+            if m:
+                token = m[2]  # "04" or "3-04"
+                ch_name = (m[3] or '').strip()
+
+                if '-' in token:
+                    # New flat format: CH B-CC
+                    b, c = token.split('-')
+                    cur_book = int(b)
+                    ch_num = int(c)
+                else:
+                    # Old format: CH num (uses cur_book)
+                    ch_num = int(token)
+
+                if cur_book is None:
+                    continue
+
+                ch_ref = f"{cur_book}-{ch_num:02d}"
+                toc_ref = f"{ch_ref}-01"
+                cur_ch = {'ref': ch_ref, 'number': ch_num, 'name': ch_name, 'toc': toc_ref, 'sections': []}
+                chapters.append(cur_ch)
+                continue
+
+            # Section: page | name | LOs
+            m = _TOC_SECTION.match(clean) if cur_ch is not None else None
+            if m:
+                page_num = int(m[1])
+                sec_name = m[2].strip() if m[2] is not None else f'Page {page_num}'
+                lo_str = (m[3] or '').strip()
+                los = [x.strip() for x in lo_str.split(',') if x.strip()] if lo_str else []
+                page_ref = f"{cur_ch['ref']}-{page_num:02d}"
+                sec = {'name': sec_name, 'page': page_ref}
+                if los:
+                    sec['lo'] = los
+                cur_ch['sections'].append(sec)
 
     return chapters if chapters else None
 
@@ -342,7 +404,7 @@ body:not(.toc-hidden) .side-nav.prev{left:310px}
     </div>
   </div>
   <div class="image-container fit-height" id="imageContainer">
-    <img id="pageImage" src="" alt="Page">
+    <img id="pageImage" src="" alt="Page" decoding="async">
   </div>
 </div>
 
@@ -357,19 +419,23 @@ const CONFIG = __CONFIG__;
 const $ = id => document.getElementById(id);
 const img = $('pageImage');
 const container = $('imageContainer');
+// Elements touched on every page change, looked up once
+const els = {
+    bc: $('breadcrumb'), cp: $('currentPage'), pt: $('pageTotal'), zi: $('zoomIndicator'),
+    su: $('scrollUp'), sd: $('scrollDown'), fh: $('fitHeight'), fw: $('fitWidth')
+};
 
 // ── State ──
 let state = { page: 0, zoom: 1, fitMode: 'height', translateX: 0, translateY: 0 };
 try { const s = localStorage.getItem('ba_viewer'); if (s) Object.assign(state, JSON.parse(s)); } catch(e) {}
 function saveState() { try { localStorage.setItem('ba_viewer', JSON.stringify(state)); } catch(e) {} }
 
-// ── Ref parsing: "pages/3-04-25.webp" → {book:3, chapter:4, page:25} ──
-function getRef(idx) {
-    return CONFIG.pages[idx].replace(/^.*\//, '').replace(/\.[^.]+$/, '');
-}
-function parseRef(ref) {
-    const m = ref.match(/^(\d+)-(\d+)-(\d+)$/);
-    return m ? { book: +m[1], chapter: +m[2], page: +m[3], ref } : null;
+// ── Ref lookup: page idx → {book:3, chapter:4, page:25} (parsed at build time) ──
+// REFS packs [book, chapter, page] per page; book -1 marks a non B-CC-PP name
+const REFS = new Int32Array(CONFIG.refPack);
+function parseRef(idx) {
+    const i = 3 * idx;
+    return REFS[i] < 0 ? null : { book: REFS[i], chapter: REFS[i + 1], page: REFS[i + 2] };
 }
 function makeRef(b, c, p) {
     return b + '-' + String(c).padStart(2,'0') + '-' + String(p).padStart(2,'0');
@@ -381,14 +447,31 @@ function findChapter(ref) {
 }
 function chRef(p) { return p.book + '-' + String(p.chapter).padStart(2,'0'); }
 
+// ── Preload neighbours so ‹ › doesn't wait on fetch + decode ──
+function preloadAround(idx) {
+    for (const d of [1, -1]) {
+        const j = idx + d;
+        if (j >= 0 && j < CONFIG.pages.length) {
+            const p = new Image();
+            p.decoding = 'async';
+            p.src = CONFIG.pages[j];
+        }
+    }
+}
+
 // ── Load page ──
 function loadPage(idx) {
     if (idx < 0 || idx >= CONFIG.pages.length) return;
     state.page = idx;
     img.src = CONFIG.pages[idx];
+    preloadAround(idx);
     state.zoom = 1; state.translateX = state.translateY = 0;
-    updateTransform();
-    container.scrollTop = container.scrollLeft = 0;
+    updateTransform();  // transform write only, no layout: keep it in step with state
+    // Reset scroll once the bitmap is decoded, so layout runs against the new page
+    img.decode().catch(() => {}).finally(() => {
+        if (state.page !== idx) return;  // a later loadPage owns the view now
+        container.scrollTop = container.scrollLeft = 0;
+    });
     updateBreadcrumb();
     updateTOCHighlight();
     updateScrollButtons();
@@ -397,10 +480,8 @@ function loadPage(idx) {
 
 // ── Breadcrumb ──
 function updateBreadcrumb() {
-    const p = parseRef(getRef(state.page));
-    const bc = $('breadcrumb');
-    const cp = $('currentPage');
-    const pt = $('pageTotal');
+    const p = parseRef(state.page);
+    const { bc, cp, pt } = els;
 
     if (!p) { bc.innerHTML = ''; cp.textContent = state.page + 1; pt.textContent = '/ ' + CONFIG.pages.length; return; }
 
@@ -408,9 +489,8 @@ function updateBreadcrumb() {
     const chLabel = chapter ? 'Ch' + p.chapter + ': ' + chapter.name : 'Ch ' + p.chapter;
     const pageLabel = p.page === 1 ? 'Contents' : 'p.' + p.page;
 
-    // Count pages in this chapter
-    const chPrefix = chRef(p) + '-';
-    const chPages = CONFIG.pages.filter(pg => pg.includes(chPrefix)).length;
+    // Pages in this chapter (precomputed at build time)
+    const chPages = CONFIG.chapterCounts[chRef(p)] || 0;
 
     bc.innerHTML =
         `<span data-nav="chapter" data-ref="${chRef(p)}">${chLabel}</span>`;
@@ -434,8 +514,8 @@ function scrollPage(dir) {
 }
 
 function updateScrollButtons() {
-    $('scrollUp').classList.add('visible');
-    $('scrollDown').classList.add('visible');
+    els.su.classList.add('visible');
+    els.sd.classList.add('visible');
 }
 
 // ── Fit mode ──
@@ -443,8 +523,8 @@ function setFitMode(mode) {
     state.fitMode = mode;
     container.classList.remove('fit-height', 'fit-width');
     container.classList.add('fit-' + mode);
-    $('fitHeight').classList.toggle('active', mode === 'height');
-    $('fitWidth').classList.toggle('active', mode === 'width');
+    els.fh.classList.toggle('active', mode === 'height');
+    els.fw.classList.toggle('active', mode === 'width');
     state.zoom = 1; state.translateX = state.translateY = 0;
     updateTransform();
     updateScrollButtons();
@@ -455,11 +535,11 @@ function setFitMode(mode) {
 function updateTransform() {
     if (state.zoom === 1) {
         img.style.transform = '';
-        $('zoomIndicator').style.display = 'none';
+        els.zi.style.display = 'none';
     } else {
         img.style.transform = `scale(${state.zoom}) translate(${state.translateX}px,${state.translateY}px)`;
-        $('zoomIndicator').textContent = Math.round(state.zoom * 100) + '%';
-        $('zoomIndicator').style.display = 'block';
+        els.zi.textContent = Math.round(state.zoom * 100) + '%';
+        els.zi.style.display = 'block';
     }
 }
 function zoom(delta) { state.zoom = Math.max(.25, Math.min(5, state.zoom + delta)); updateTransform(); }
@@ -484,76 +564,100 @@ function toggleTOC(show) {
     else document.body.classList.toggle('toc-hidden');
 }
 
+// Sections per chapter, sorted by start page: ref → { pages: Uint32Array, secEls: [...] }
+let tocSections = {};
+let activeSection = null;
+let _tocRaf = 0;  // pending TOC scroll; a burst of page turns scrolls once
+
 function renderTOC() {
     const content = $('tocContent');
     if (!CONFIG.toc?.length) {
-        let html = '';
+        const parts = [];
         for (let i = 0; i < CONFIG.pages.length; i += 20) {
-            html += `<div class="toc-item" data-idx="${i}">Pages ${i+1}–${Math.min(i+20, CONFIG.pages.length)}</div>`;
+            parts.push(`<div class="toc-item" data-idx="${i}">Pages ${i+1}–${Math.min(i+20, CONFIG.pages.length)}</div>`);
         }
-        content.innerHTML = html;
-        content.querySelectorAll('.toc-item').forEach(el => {
-            el.onclick = () => { loadPage(+el.dataset.idx); toggleTOC(false); };
-        });
+        content.innerHTML = parts.join('');
+        content.onclick = e => {
+            const el = e.target.closest('.toc-item');
+            if (el) { loadPage(+el.dataset.idx); toggleTOC(false); }
+        };
         return;
     }
 
-    let html = '';
+    const parts = [];
     CONFIG.toc.forEach(ch => {
         const chIdx = CONFIG.pageMap[ch.toc] ?? 0;
-        html += `<div class="toc-chapter" data-ref="${ch.ref}" data-idx="${chIdx}">${ch.ref.replace(/^\d+-/,'')}. ${ch.name}</div>`;
-        html += `<div class="toc-sections" data-ref="${ch.ref}">`;
+        parts.push(`<div class="toc-chapter" data-ref="${ch.ref}" data-idx="${chIdx}">${ch.ref.replace(/^\d+-/,'')}. ${ch.name}</div>`);
+        parts.push(`<div class="toc-sections" data-ref="${ch.ref}">`);
         (ch.sections || []).forEach(s => {
             const sIdx = CONFIG.pageMap[s.page];
-            html += `<div class="toc-item toc-section" data-idx="${sIdx ?? 0}" data-ref="${ch.ref}">${s.name}</div>`;
+            parts.push(`<div class="toc-item toc-section" data-idx="${sIdx ?? 0}" data-ref="${ch.ref}">${s.name}</div>`);
         });
-        html += `</div>`;
-    });
-    content.innerHTML = html;
-
-    // Chapter toggle (click heading → expand/collapse, also navigate)
-    content.querySelectorAll('.toc-chapter').forEach(el => {
-        el.onclick = () => {
-            const wasOpen = el.classList.contains('open');
-            if (!wasOpen) {
-                // Close all, open this one
-                content.querySelectorAll('.toc-chapter').forEach(x => x.classList.remove('open'));
-                el.classList.add('open');
-            } else {
-                el.classList.toggle('open');
-            }
-            loadPage(+el.dataset.idx);
-            toggleTOC(false);
-        };
-    });
-    // Section click → navigate
-    content.querySelectorAll('.toc-section').forEach(el => {
-        el.onclick = e => { e.stopPropagation(); loadPage(+el.dataset.idx); toggleTOC(false); };
+        parts.push(`</div>`);
     });
+    content.innerHTML = parts.join('');
+
+    // One delegated handler for every chapter heading and section
+    content.onclick = e => {
+        // Section click → navigate
+        const sec = e.target.closest('.toc-section');
+        if (sec) { e.stopPropagation(); loadPage(+sec.dataset.idx); toggleTOC(false); return; }
+
+        // Chapter toggle (click heading → expand/collapse, also navigate)
+        const el = e.target.closest('.toc-chapter');
+        if (!el) return;
+        const wasOpen = el.classList.contains('open');
+        if (!wasOpen) {
+            // Close all, open this one
+            content.querySelectorAll('.toc-chapter').forEach(x => x.classList.remove('open'));
+            el.classList.add('open');
+        } else {
+            el.classList.toggle('open');
+        }
+        loadPage(+el.dataset.idx);
+        toggleTOC(false);
+    };
+
+    // Index sections by start page once, for updateTOCHighlight's binary search
+    const byCh = {};
+    content.querySelectorAll('.toc-section').forEach(el => (byCh[el.dataset.ref] ||= []).push(el));
+    tocSections = {};
+    for (const [ref, secEls] of Object.entries(byCh)) {
+        secEls.sort((a, b) => a.dataset.idx - b.dataset.idx);
+        tocSections[ref] = { pages: new Uint32Array(secEls.map(el => +el.dataset.idx)), secEls };
+    }
 }
 
 function updateTOCHighlight() {
-    const p = parseRef(getRef(state.page));
+    const p = parseRef(state.page);
     const ref = p ? chRef(p) : null;
     // Expand current chapter
     document.querySelectorAll('.toc-chapter').forEach(el => {
         el.classList.toggle('open', ref && el.dataset.ref === ref);
         el.classList.toggle('active-ch', ref && el.dataset.ref === ref);
     });
-    // Highlight nearest section
-    let best = null, bestDist = Infinity;
-    document.querySelectorAll('.toc-section[data-idx]').forEach(el => {
-        const idx = +el.dataset.idx;
-        el.classList.remove('active');
-        const dist = state.page - idx;
-        if (dist >= 0 && dist < bestDist && ref && el.dataset.ref === ref) {
-            best = el; bestDist = dist;
+    // Highlight nearest section at or before the current page
+    if (activeSection) { activeSection.classList.remove('active'); activeSection = null; }
+    const secs = ref && tocSections[ref];
+    let best = null;
+    if (secs) {
+        const pages = secs.pages;
+        let lo = 0, hi = pages.length;
+        while (lo < hi) { const m = (lo + hi) >> 1; if (pages[m] <= state.page) lo = m + 1; else hi = m; }
+        if (lo > 0) {
+            let k = lo - 1;
+            while (k > 0 && pages[k - 1] === pages[k]) k--;  // first of equal starts, as before
+            best = secs.secEls[k];
         }
-    });
+    }
     if (best) {
+        activeSection = best;
         best.classList.add('active');
         if (!document.body.classList.contains('toc-hidden')) {
-            best.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+            if (!_tocRaf) _tocRaf = requestAnimationFrame(() => {
+                _tocRaf = 0;
+                activeSection?.scrollIntoView({ block: 'nearest', behavior: 'auto' });
+            });
         }
     }
 }
@@ -708,6 +812,12 @@ container.focus();
 </html>'''
 
 
+# Encoded and split once at import: literal chunks at even indices, placeholder
+# names (b'TITLE', b'CONFIG', ...) at odd ones, so build() fills it in one join
+_PLACEHOLDER = re.compile(rb'__(TITLE|CONFIG|VERSION|DATE|CANONICAL)__')
+_TEMPLATE_PARTS = _PLACEHOLDER.split(get_template().encode('utf-8'))
+
+
 def build(folder):
     folder = Path(folder)
     images, img_folder = find_images(folder)
@@ -724,10 +834,21 @@ def build(folder):
     images_full = [img_prefix + im for im in images]
 
     # Build ref → index map from filenames
-    page_map = {}
-    for i, im in enumerate(images):
-        stem = Path(im).stem  # "1-01-14"
-        page_map[stem] = i
+    page_map = {im.rpartition('.')[0]: i for i, im in enumerate(images)}  # "1-01-14" → index
+
+    # Parsed (book, chapter, page) per image, so the viewer never runs a regex;
+    # packed flat as [b0, c0, p0, b1, c1, p1, ...] for an Int32Array
+    refs = [parse_ref(im) for im in images]
+    ref_pack = []
+    for ref in refs:
+        ref_pack += ref or (-1, 0, 0)
+
+    # Pages per chapter ("1-01" → 24), so the viewer needn't scan CONFIG.pages
+    chapter_counts = {}
+    for ref in refs:
+        if ref:
+            ch = f"{ref[0]}-{ref[1]:02d}"
+            chapter_counts[ch] = chapter_counts.get(ch, 0) + 1
 
     # Load TOC (toc.txt preferred, toc.json fallback)
     toc, toc_source = load_toc(folder)
@@ -737,19 +858,29 @@ def build(folder):
     config = {
         'pages': images_full,
         'toc': toc,
-        'pageMap': page_map
+        'pageMap': page_map,
+        'refPack': ref_pack,
+        'chapterCounts': chapter_counts
     }
 
-    from datetime import datetime
-    html = get_template()
-    html = html.replace('__TITLE__', title)
-    html = html.replace('__CONFIG__', json.dumps(config, separators=(',', ':')))
-    html = html.replace('__VERSION__', VERSION)
-    html = html.replace('__DATE__', datetime.now().strftime('%Y-%m-%d %H:%M'))
-    html = html.replace('__CANONICAL__', f'./{folder.name}/')
+    if orjson:
+        config_json = orjson.dumps(config)  # compact UTF-8 bytes already
+    else:
+        config_json = json.dumps(config, separators=(',', ':'), ensure_ascii=True, check_circular=False).encode('ascii')
+
+    values = {
+        b'TITLE': title.encode('utf-8'),
+        b'CONFIG': config_json,
+        b'VERSION': VERSION.encode('ascii'),
+        b'DATE': datetime.now().strftime('%Y-%m-%d %H:%M').encode('ascii'),
+        b'CANONICAL': f'./{folder.name}/'.encode('utf-8'),
+    }
+    parts = _TEMPLATE_PARTS[:]
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    html = b''.join(parts)
 
     output = folder / 'index.html'
-    output.write_text(html, encoding='utf-8')
+    output.write_bytes(html)
 
     toc_info = 'No'
     if toc:
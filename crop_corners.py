@@ -7,6 +7,8 @@ Output: e:/comic/corners/ with same filenames
 import os, sys, re
 from PIL import Image
 
+_FNAME_RE = re.compile(r'\d-\d\d-\d\d\.(?:jpg|webp|png)$')  # B-CC-PP page files
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python crop_corners.py <raw_folder>")
@@ -16,18 +18,22 @@ def main():
     out = os.path.join(os.path.dirname(raw), 'corners')
     os.makedirs(out, exist_ok=True)
 
-    files = sorted(f for f in os.listdir(raw)
-                   if re.match(r'\d-\d\d-\d\d\.(jpg|webp|png)', f))
+    files = sorted(filter(_FNAME_RE.match, os.listdir(raw)))
 
     print(f"Cropping {len(files)} files -> {out}")
 
+    # Joined once, not per file; progress only on a console (no flushes when piped)
+    raw_dir = os.path.join(raw, '')
+    out_dir = os.path.join(out, '')
+    progress = sys.stdout.isatty()
+
     for i, fname in enumerate(files):
-        img = Image.open(os.path.join(raw, fname))
+        img = Image.open(raw_dir + fname)
         w, h = img.size
         # Top-left: 1/2 width, 1/5 height
         crop = img.crop((0, 0, w // 2, h // 5))
-        crop.save(os.path.join(out, fname), quality=85)
-        if (i + 1) % 100 == 0:
+        crop.save(out_dir + fname, quality=85)
+        if progress and (i + 1) % 100 == 0:
             print(f"  {i+1}/{len(files)}")
 
     print(f"Done. {len(files)} corners saved to {out}")
@@ -18,10 +18,19 @@ How it works:
 """
 
 import os, sys, re, json
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
+try:
+    import orjson  # optional: faster detections.json
+except ImportError:
+    orjson = None
+
+_FNAME_RE = re.compile(r'\d-\d\d-\d\d\.(?:jpg|webp|png)$')  # B-CC-PP page files
+
 # ── Expected sections per chapter (from toc.txt) ──
 SECTIONS = {
     '1-01': ['First Day', 'Campus Tour', 'One Hundred'],
@@ -87,7 +96,36 @@ SECTIONS = {
 }
 
 
-def score_plaque(img_path, crop_box=(0, 0, 0.25, 0.12)):
+# Plaque score: top-left 25% x 12% of the page, as (x0, y0, x1, y1) fractions,
+# downsampled to 100x50 before scoring
+SCORE_CROP = (0, 0, 0.25, 0.12)
+# Contact-sheet thumbnails: top-left 30% x 15% of the page, shown at 180x100
+SHEET_CROP = (0.30, 0.15)
+SHEET_THUMB = (180, 100)
+
+
+def _draft_size(out_size, frac_w, frac_h):
+    """Smallest full-page size whose frac_w x frac_h crop still covers out_size"""
+    return int(out_size[0] / frac_w) + 1, int(out_size[1] / frac_h) + 1
+
+
+def _open_page(img_path, crop_box=SCORE_CROP):
+    """Open and decode a page, or None if it can't be read.
+    JPEG: libjpeg decodes at 1/2..1/8 scale (DCT scaling) while both the score
+    crop and the sheet crop still cover their thumbnails; no-op otherwise.
+    Shared by score_plaque and score_page so both score the same pixels."""
+    score_size = _draft_size((100, 50), crop_box[2] - crop_box[0], crop_box[3] - crop_box[1])
+    sheet_size = _draft_size(SHEET_THUMB, *SHEET_CROP)
+    try:
+        img = Image.open(img_path)
+        img.draft(None, (max(score_size[0], sheet_size[0]), max(score_size[1], sheet_size[1])))
+        img.load()
+    except:
+        return None
+    return img
+
+
+def score_plaque(img_path, crop_box=SCORE_CROP):
     """Score how likely the top-left crop contains a title plaque.
     
     Plaques have:
@@ -95,59 +133,80 @@ def score_plaque(img_path, crop_box=(0, 0, 0.25, 0.12)):
     - Regions of solid color (plaque background)  
     - High contrast between text and background
     
-    Returns score (higher = more likely plaque).
+    Returns score (higher = more likely plaque), the same one main() uses.
     """
-    try:
-        img = Image.open(img_path)
-    except:
+    img = _open_page(img_path, crop_box)
+    if img is None:
         return -1
+    return _score_image(img, crop_box)
+
+
+def score_page(img_path):
+    """(score, contact-sheet thumbnail) from a single decode of the page;
+    (-1, None) if it can't be read."""
+    img = _open_page(img_path)
+    if img is None:
+        return -1, None
     
+    w, h = img.size
+    thumb = img.crop((0, 0, int(w * SHEET_CROP[0]), int(h * SHEET_CROP[1])))
+    thumb = thumb.resize(SHEET_THUMB, Image.LANCZOS)
+    return _score_image(img), thumb
+
+
+def _score_image(img, crop_box=SCORE_CROP):
+    """score_plaque on an already decoded image"""
     w, h = img.size
     x0 = int(w * crop_box[0])
     y0 = int(h * crop_box[1])
     x1 = int(w * crop_box[2])
     y1 = int(h * crop_box[3])
+    if x1 - x0 < 20 or y1 - y0 < 10:
+        return -1  # too small to hold a plaque
     crop = img.crop((x0, y0, x1, y1))
     
-    # Resize for speed
-    thumb = crop.resize((100, 50), Image.LANCZOS)
-    arr = np.array(thumb).astype(float)
+    # Resize for speed (area-average BOX: the coarse heuristics below need no Lanczos);
+    # RGB so every block below has exactly 3 channels
+    thumb = crop.resize((100, 50), Image.BOX).convert('RGB')
+    arr = np.asarray(thumb, dtype=np.float32)
+    gray = np.asarray(thumb.convert('L'), dtype=np.float32)
     
     # Score 1: Edge density (plaques have strong rectangular borders)
-    gray = thumb.convert('L')
-    edges = gray.filter(ImageFilter.FIND_EDGES)
-    edge_score = np.mean(np.array(edges))
+    # Same 3x3 kernel as ImageFilter.FIND_EDGES (8·centre − 8 neighbours),
+    # clipped to 0..255; border pixels pass through unfiltered as in PIL
+    edges = gray.copy()
+    inner = 9 * gray[1:-1, 1:-1]
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            inner -= gray[dy:dy + gray.shape[0] - 2, dx:dx + gray.shape[1] - 2]
+    edges[1:-1, 1:-1] = np.clip(inner, 0, 255)
+    edge_score = edges.mean()
     
     # Score 2: Color block uniformity — look for large-ish patches of solid color
     # Split into 5x5 grid, count blocks with low internal variance
     gh, gw = 5, 5
     bh, bw = arr.shape[0] // gh, arr.shape[1] // gw
-    uniform_blocks = 0
-    for gy in range(gh):
-        for gx in range(gw):
-            block = arr[gy*bh:(gy+1)*bh, gx*bw:(gx+1)*bw]
-            var = np.mean([np.var(block[:, :, c]) for c in range(min(3, block.shape[2]))])
-            if var < 300:
-                uniform_blocks += 1
-    block_score = uniform_blocks / (gh * gw)
+    blocks = arr[:gh * bh, :gw * bw].reshape(gh, bh, gw, bw, 3)
+    block_var = blocks.var(axis=(1, 3)).mean(axis=-1)
+    block_score = (block_var < 300).sum() / (gh * gw)
     
     # Score 3: Contrast — high std dev across whole crop means text+bg contrast
-    contrast_score = np.std(arr) / 80.0  # normalize
+    contrast_score = arr.std() / 80.0  # normalize
     
     # Score 4: Check for horizontal/vertical structure (plaque borders)
-    gray_arr = np.array(gray).astype(float)
-    h_edges = np.mean(np.abs(np.diff(gray_arr, axis=1)))
-    v_edges = np.mean(np.abs(np.diff(gray_arr, axis=0)))
+    h_edges = np.abs(np.diff(gray, axis=1)).mean()
+    v_edges = np.abs(np.diff(gray, axis=0)).mean()
     structure_score = (h_edges + v_edges) / 30.0
     
     # Combined score (tuned to prefer plaque characteristics)
     total = edge_score * 0.3 + block_score * 15 + contrast_score * 5 + structure_score * 3
     
-    return total
+    return float(total)
 
 
-def make_contact_sheet(chapter_key, file_list, folder, out_dir, scores):
-    """Create a visual grid of top-left crops for manual verification."""
+def make_contact_sheet(chapter_key, file_list, thumbs, out_dir, scores):
+    """Create a visual grid of top-left crops for manual verification.
+    thumbs maps filename → SHEET_THUMB image from score_page (None if unreadable)."""
     n = len(file_list)
     if n == 0:
         return
@@ -155,7 +214,7 @@ def make_contact_sheet(chapter_key, file_list, folder, out_dir, scores):
     cols = min(8, n)
     rows = (n + cols - 1) // cols
     
-    thumb_w, thumb_h = 180, 100
+    thumb_w, thumb_h = SHEET_THUMB
     pad = 4
     label_h = 20
     cell_w = thumb_w + pad * 2
@@ -166,11 +225,16 @@ def make_contact_sheet(chapter_key, file_list, folder, out_dir, scores):
     
     sheet = Image.new('RGB', (sheet_w, sheet_h), (255, 255, 255))
     draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default()
     
     # Title
     n_expected = len(SECTIONS.get(chapter_key, []))
     title = f"CH {chapter_key} — {n} pages, {n_expected} sections expected"
-    draw.text((10, 10), title, fill=(0, 0, 0))
+    draw.text((10, 10), title, fill=(0, 0, 0), font=font)
+    
+    # Top-N scoring pages, ranked once for the whole sheet
+    ranked = sorted([(scores.get(f, 0), f) for f in file_list], reverse=True)
+    top_n = {f for _, f in ranked[:n_expected]}
     
     for i, fname in enumerate(file_list):
         col = i % cols
@@ -178,20 +242,10 @@ def make_contact_sheet(chapter_key, file_list, folder, out_dir, scores):
         x = col * cell_w + pad
         y = row * cell_h + 40 + pad
         
-        fpath = os.path.join(folder, fname)
-        try:
-            img = Image.open(fpath)
-            w, h = img.size
-            crop = img.crop((0, 0, int(w * 0.30), int(h * 0.15)))
-            crop = crop.resize((thumb_w, thumb_h), Image.LANCZOS)
-        except:
-            crop = Image.new('RGB', (thumb_w, thumb_h), (200, 200, 200))
+        crop = thumbs.get(fname) or Image.new('RGB', (thumb_w, thumb_h), (200, 200, 200))
         
         # Highlight detected plaques
         score = scores.get(fname, 0)
-        expected = SECTIONS.get(chapter_key, [])
-        ranked = sorted([(scores.get(f, 0), f) for f in file_list], reverse=True)
-        top_n = [f for _, f in ranked[:len(expected)]]
         
         if fname in top_n:
             # Green border for detected
@@ -201,9 +255,9 @@ def make_contact_sheet(chapter_key, file_list, folder, out_dir, scores):
         sheet.paste(crop, (x, y))
         
         # Label
-        page_num = fname.split('-')[-1].split('.')[0]
+        page_num = fname[5:7]
         label = f"p{page_num} ({score:.0f})"
-        draw.text((x, y + thumb_h + 2), label, fill=(0, 0, 0))
+        draw.text((x, y + thumb_h + 2), label, fill=(0, 0, 0), font=font)
     
     sheet.save(os.path.join(out_dir, f"contact_{chapter_key}.png"))
 
@@ -221,7 +275,7 @@ def main():
     
     # Detect file extension
     files = sorted(os.listdir(folder))
-    img_files = [f for f in files if re.match(r'\d-\d\d-\d\d\.(jpg|webp|png)', f)]
+    img_files = [f for f in files if _FNAME_RE.match(f)]
     if not img_files:
         print(f"No B-CC-PP image files found in {folder}")
         sys.exit(1)
@@ -230,10 +284,9 @@ def main():
     print(f"Found {len(img_files)} {ext} files")
     
     # Group by chapter
-    chapters = {}
+    chapters = defaultdict(list)
     for f in img_files:
-        ch_key = f[:4]  # "1-01"
-        chapters.setdefault(ch_key, []).append(f)
+        chapters[f[:4]].append(f)  # "1-01"
     
     print(f"Found {len(chapters)} chapters")
     
@@ -241,6 +294,12 @@ def main():
     out_dir = os.path.join(os.path.dirname(folder), 'plaque_results')
     os.makedirs(out_dir, exist_ok=True)
     
+    # Score every page of every chapter with sections, across all cores
+    to_score = [f for ch_key in chapters if SECTIONS.get(ch_key) for f in chapters[ch_key]]
+    with ProcessPoolExecutor() as pool:
+        fpaths = [os.path.join(folder, f) for f in to_score]
+        results = dict(zip(to_score, pool.map(score_page, fpaths, chunksize=16)))
+    
     # Process each chapter
     all_detections = {}
     
@@ -253,11 +312,10 @@ def main():
             print(f"  {ch_key}: no sections defined, skipping")
             continue
         
-        # Score every page
-        scores = {}
-        for fname in ch_files:
-            fpath = os.path.join(folder, fname)
-            scores[fname] = score_plaque(fpath)
+        # Take this chapter's results out of results, so its thumbnails are
+        # freed once the contact sheet is drawn instead of living to the end
+        ch_results = {f: results.pop(f) for f in ch_files}
+        scores = {f: r[0] for f, r in ch_results.items()}
         
         # Rank and pick top N (but page 01 is always TOC, skip it)
         # Also first section always starts at page 02 or 03
@@ -265,11 +323,8 @@ def main():
         ranked = sorted(non_toc, key=lambda f: scores.get(f, 0), reverse=True)
         detected = sorted(ranked[:n_expected])  # sort by page order
         
-        # Extract page numbers
-        pages = []
-        for f in detected:
-            pg = int(f.split('-')[-1].split('.')[0])
-            pages.append(pg)
+        # Extract page numbers ("B-CC-PP.ext": _FNAME_RE fixes PP at [5:7])
+        pages = [int(f[5:7]) for f in detected]
         
         all_detections[ch_key] = {
             'expected_sections': expected,
@@ -282,13 +337,17 @@ def main():
         print(f"  {ch_key}: {n_expected} sections → pages {pages} {status}")
         
         # Generate contact sheet
-        make_contact_sheet(ch_key, ch_files, folder, out_dir, scores)
+        make_contact_sheet(ch_key, ch_files, {f: r[1] for f, r in ch_results.items()}, out_dir, scores)
     
     # ── Write results ──
     
     # 1. Raw detections JSON
-    with open(os.path.join(out_dir, 'detections.json'), 'w') as f:
-        json.dump(all_detections, f, indent=2)
+    if orjson:
+        with open(os.path.join(out_dir, 'detections.json'), 'wb') as f:
+            f.write(orjson.dumps(all_detections, option=orjson.OPT_INDENT_2))
+    else:
+        with open(os.path.join(out_dir, 'detections.json'), 'w') as f:
+            json.dump(all_detections, f, indent=2)
     
     # 2. Human-readable detected sections
     with open(os.path.join(out_dir, 'detected_sections.txt'), 'w') as f:
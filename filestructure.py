@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 """Show folder structure - writes to structure.txt"""
+import os
 import sys
 from pathlib import Path
 
 lines = []
 
 def show_structure(folder, prefix="", max_files=50):
-    folder = Path(folder)
+    # One scandir pass; DirEntry's cached type splits dirs from files without a stat each
+    dirs, files = [], []
     try:
-        items = sorted(folder.iterdir())
+        with os.scandir(folder) as it:
+            for e in it:
+                if e.is_dir():
+                    dirs.append(e)
+                elif e.is_file():
+                    files.append(e)
     except PermissionError:
         lines.append(f"{prefix}[access denied]")
         return
-    
-    dirs = [i for i in items if i.is_dir()]
-    files = [i for i in items if i.is_file()]
+    # Same order as sorting Paths (case-insensitive on Windows)
+    dirs.sort(key=lambda e: os.path.normcase(e.name))
+    files.sort(key=lambda e: os.path.normcase(e.name))
     
     for f in files[:max_files]:
         lines.append(f"{prefix}{f.name}")
@@ -23,12 +30,12 @@ def show_structure(folder, prefix="", max_files=50):
     
     for d in dirs:
         lines.append(f"{prefix}{d.name}/")
-        show_structure(d, prefix + "  ", max_files)
+        show_structure(d.path, prefix + "  ", max_files)
 
 if __name__ == "__main__":
     folder = sys.argv[1] if len(sys.argv) > 1 else r"E:\comic"
     lines.append(f"{folder}/")
     show_structure(folder)
     out = Path(folder) / "structure.txt"
-    out.write_text("\n".join(lines), encoding="utf-8")
+    out.write_bytes("\n".join(lines).encode("utf-8"))
     print(f"Wrote {out} ({len(lines)} lines)")
@@ -5,33 +5,46 @@ from pathlib import Path
 
 ROOT = Path(r"E:\comic")
 
+_GB, _MB, _KB = 1 << 30, 1 << 20, 1 << 10
+
 def fmt(b):
-    if b >= 1 << 30: return f"{b / (1 << 30):.2f} GB"
-    if b >= 1 << 20: return f"{b / (1 << 20):.1f} MB"
-    if b >= 1 << 10: return f"{b / (1 << 10):.1f} KB"
+    if b >= _GB: return f"{b / _GB:.2f} GB"
+    if b >= _MB: return f"{b / _MB:.1f} MB"
+    if b >= _KB: return f"{b / _KB:.1f} KB"
     return f"{b} B"
 
 def dir_stats(p):
+    # Iterative scandir walk: DirEntry caches type (and on Windows, size)
+    # from the directory listing, so most files cost no extra stat call
     total = 0
     count = 0
-    for f in p.rglob('*'):
-        if f.is_file():
-            total += f.stat().st_size
-            count += 1
+    stack = [p]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                elif e.is_file():
+                    total += e.stat().st_size
+                    count += 1
     return total, count
 
-# Gather top-level entries
+# Gather top-level entries: (name, size, file count, formatted size)
 entries = []
 grand_total = 0
 
 for item in sorted(ROOT.iterdir()):
     if item.is_dir():
         size, count = dir_stats(item)
-        entries.append((item.name + '/', size, count))
+        entries.append((item.name + '/', size, count, fmt(size)))
         grand_total += size
     elif item.is_file():
         size = item.stat().st_size
-        entries.append((item.name, size, 1))
+        entries.append((item.name, size, 1, fmt(size)))
         grand_total += size
 
 # Print
@@ -41,10 +54,10 @@ print(f"{'='*60}")
 print(f"  {'Name':<28} {'Size':>10} {'Files':>7} {'%':>6}")
 print(f"  {'-'*28} {'-'*10} {'-'*7} {'-'*6}")
 
-for name, size, count in sorted(entries, key=lambda x: -x[1]):
+for name, size, count, size_str in sorted(entries, key=lambda x: -x[1]):
     pct = size / grand_total * 100 if grand_total else 0
     bar = '█' * int(pct / 2.5)
-    print(f"  {name:<28} {fmt(size):>10} {count:>7} {pct:>5.1f}% {bar}")
+    print(f"  {name:<28} {size_str:>10} {count:>7} {pct:>5.1f}% {bar}")
 
 print(f"  {'-'*28} {'-'*10} {'-'*7} {'-'*6}")
 print(f"  {'TOTAL':<28} {fmt(grand_total):>10} {sum(e[2] for e in entries):>7}")
@@ -19,29 +19,31 @@ os.chdir(script_dir)
 folder = script_dir.name
 remote = f"https://github.com/{GITHUB_USER}/{folder}.git"
 
-def run(cmd):
-    print(f"  {cmd}")
-    return subprocess.run(cmd, shell=True, capture_output=True, text=True)
+def run(*cmd):
+    # Argument list, no shell: git starts directly, without a cmd.exe/sh in between
+    print(f"  {' '.join(cmd)}")
+    return subprocess.run(cmd, capture_output=True, text=True)
 
 # Init if needed
 if not Path(".git").exists():
     print(f"Initializing git repo for '{folder}'...")
-    run("git init")
-    run(f"git remote add origin {remote}")
-    run("git branch -M main")
-
-# Check remote is correct
-result = run("git remote get-url origin")
-if result.stdout.strip() != remote:
-    print(f"Updating remote to {remote}")
-    run("git remote remove origin")
-    run(f"git remote add origin {remote}")
+    if run("git", "init", "-b", "main").returncode != 0:
+        # git < 2.28 has no init -b: plain init, then rename the branch
+        run("git", "init")
+        run("git", "branch", "-M", "main")
+    run("git", "remote", "add", "origin", remote)
+else:
+    # Check remote is correct (set-url rewrites it in place; add if missing)
+    result = run("git", "remote", "get-url", "origin")
+    if result.stdout.strip() != remote:
+        print(f"Updating remote to {remote}")
+        run("git", "remote", "set-url" if result.returncode == 0 else "add", "origin", remote)
 
 msg = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else f"Update {datetime.now().strftime('%Y-%m-%d %H:%M')}"
 
 print(f"Pushing '{folder}' → {GITHUB_USER}/{folder}")
-run("git add -A")
-run(f'git commit -m "{msg}"')
-if run("git push -u origin main --force").returncode != 0:
-    run("git push --force")
+run("git", "add", "-A")
+run("git", "commit", "-m", msg)
+if run("git", "push", "-u", "origin", "main", "--force").returncode != 0:
+    run("git", "push", "--force")
 print("Done!")
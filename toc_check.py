@@ -1,19 +1,30 @@
 #!/usr/bin/env python3
 """Diagnose toc.txt page refs vs actual capture files.
 Run from E:\comic — outputs toc_check.txt"""
+import os
+import re
 from pathlib import Path
 from collections import defaultdict
 
 ROOT = Path(r"E:\comic")
 PAGES = ROOT / "pages"
+PAGE_RE = re.compile(r"(\d+)-(\d+)-(\d+)\.webp", re.I)  # "1-01-14.webp", any case as on Windows
 
-# Count actual files per chapter
+# Count actual files per chapter (scandir names only, no Path per file);
+# a missing pages/ just means no captures, so the report still gets written
 chapter_files = defaultdict(list)
-for f in sorted(PAGES.glob("*.webp")):
-    parts = f.stem.split("-")
-    if len(parts) == 3:
-        key = f"{parts[0]}-{parts[1]}"  # e.g. "1-01"
-        chapter_files[key].append(int(parts[2]))
+names = []
+if PAGES.is_dir():
+    with os.scandir(PAGES) as it:
+        names = sorted(e.name for e in it)
+for name in names:
+    m = PAGE_RE.fullmatch(name)
+    if m:
+        chapter_files[f"{m[1]}-{m[2]}"].append(int(m[3]))  # key e.g. "1-01"
+
+# Per-chapter max page and page set, computed once rather than per section
+chapter_max = {k: max(v) for k, v in chapter_files.items()}
+chapter_set = {k: set(v) for k, v in chapter_files.items()}
 
 # Parse toc.txt
 lines = []
@@ -34,10 +45,10 @@ for raw in (ROOT / "toc.txt").read_text(encoding="utf-8").splitlines():
         name = parts[1] if len(parts) > 1 else ""
         key = f"{cur_book}-{cur_ch:02d}"
         ref = f"{cur_book}-{cur_ch:02d}-{pg:02d}"
-        actual = chapter_files.get(key, [])
-        max_pg = max(actual) if actual else 0
-        exists = pg in actual
-        sections.append((key, pg, name, len(actual), max_pg, exists, ref))
+        count = len(chapter_files.get(key, ()))
+        max_pg = chapter_max.get(key, 0)
+        exists = pg in chapter_set.get(key, ())
+        sections.append((key, pg, name, count, max_pg, exists, ref))
 
 # Report
 out = []